@@ -2,9 +2,28 @@
 
 from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import get_args, get_origin, Any
+from pathlib import Path
+from typing import Any, Callable
 from os import environ
 
+_ENV_CACHE: dict[str, str] | None = None
+
+
+def _get_env(reset_cache: bool = False) -> dict[str, str]:
+    """Snapshot of Radarr environment variables keyed by lowered name. Built once per process.
+
+    Args:
+        reset_cache (bool, optional): Rebuild the snapshot from os.environ. Defaults to False.
+
+    Returns:
+        dict[str, str]: Radarr environment variables
+    """
+    global _ENV_CACHE  # pylint: disable=global-statement
+    if _ENV_CACHE is None or reset_cache:
+        lowered = ((k.lower().strip(), v) for k, v in environ.items())
+        _ENV_CACHE = {k: v for k, v in lowered if k.startswith("radarr_")}
+    return _ENV_CACHE
+
 
 class Events(Enum):
     """Radarr Events"""
@@ -24,14 +43,16 @@ class Events(Enum):
 
     @classmethod
     def _missing_(cls, value: object) -> Any:
-        value = value.upper()
-        for member in cls:
-            if member.value.upper() == value:
-                return member
-        return cls.UNKNOWN
+        if isinstance(value, str):
+            value = value.upper()
+        return cls._CI_MAP.get(value, cls.UNKNOWN)
+
 
+# Case insensitive lookup of Events by value
+Events._CI_MAP = {member.value.upper(): member for member in Events}
 
-@dataclass
+
+@dataclass(slots=True)
 class RadarrEnvironment:
     """Radarr Environment Variables"""
 
@@ -51,6 +72,35 @@ class RadarrEnvironment:
     health_restored_msg: str = field(default=None, metadata={"var": "Radarr_Health_Restored_Message"})
     update_message: str = field(default=None, metadata={"var": "Radarr_Update_Message"})
     raw_vars: dict = field(default=None, repr=False)
+    _movie_path: Path = field(default=None, init=False, repr=False, compare=False)
+    _movie_nfo: Path = field(default=None, init=False, repr=False, compare=False)
+    _title_year: str = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def movie_path(self) -> Path:
+        """Full path to the movie file"""
+        if self._movie_path is None:
+            self._movie_path = Path(self.movie_file_path)
+        return self._movie_path
+
+    @property
+    def movie_nfo(self) -> Path:
+        """Full path to the movie file's NFO"""
+        if self._movie_nfo is None:
+            self._movie_nfo = self.movie_path.with_suffix(".nfo")
+        return self._movie_nfo
+
+    @property
+    def title_year(self) -> str:
+        """Movie title and year as displayed in notifications"""
+        if self._title_year is None:
+            self._title_year = f"{self.movie_title} ({self.movie_year})"
+        return self._title_year
+
+    @classmethod
+    def _parse_event(cls, value: str) -> Events:
+        # Exact matches skip Enum.__call__, case-insensitive matches fall back to it
+        return Events._value2member_map_.get(value) or Events(value)
 
     @classmethod
     def _parse_bool(cls, value: str) -> bool:
@@ -74,41 +124,57 @@ class RadarrEnvironment:
 
     def __post_init__(self) -> None:
         # Get environment variables
-        self.raw_vars = {k.lower().strip(): v for k, v in environ.items() if k.lower().startswith("radarr")}
+        self.raw_vars = _get_env()
 
-        # Loop through dataclass fields
-        for attr in fields(self):
-            var_name = attr.metadata.get("var")
-            if not var_name:
-                continue
+        _setattr = object.__setattr__
+
+        # Parse the event type first, it determines which fields Radarr provides
+        name, key, parse = _EVENT_TYPE_SPEC
+        if value := self.raw_vars.get(key):
+            _setattr(self, name, parse(value))
 
-            value = self.raw_vars.get(var_name.lower())
+        # Store each environment variable's value using its precomputed parser
+        for name, key, parse in _EVENT_SPECS.get(self.event_type, _FIELD_SPECS):
+            value = self.raw_vars.get(key)
             if not value:
                 continue
 
-            # Based on attribute type, store this environment variable's value
-            if issubclass(attr.type, Events):
-                self.__setattr__(attr.name, Events(value))
-
-            elif issubclass(attr.type, str):
-                self.__setattr__(attr.name, value.strip())
-
-            elif issubclass(attr.type, bool):
-                self.__setattr__(attr.name, self._parse_bool(value))
-
-            elif issubclass(attr.type, int):
-                self.__setattr__(attr.name, self._parse_int(value))
-
-            # Handle lists
-            elif get_origin(attr.type) == list:
-                list_type = get_args(attr.type)[0]
-
-                # List of strings
-                if issubclass(list_type, str):
-                    value_lst = [x.strip() for x in value.split("|")]
-                    self.__setattr__(attr.name, value_lst)
-
-                # List of integers
-                elif issubclass(list_type, int):
-                    value_lst = [self._parse_int(x) for x in value.split(",")]
-                    self.__setattr__(attr.name, value_lst)
+            _setattr(self, name, parse(value))
+
+
+# Parsers used to convert an environment variable into each supported field type
+_PARSERS: dict[Any, Callable[[str], Any]] = {
+    Events: RadarrEnvironment._parse_event,
+    str: str.strip,
+    bool: RadarrEnvironment._parse_bool,
+    int: RadarrEnvironment._parse_int,
+    list[str]: lambda value: [x.strip() for x in value.split("|")],
+    list[int]: lambda value: [RadarrEnvironment._parse_int(x) for x in value.split(",")],
+}
+
+# (attribute name, lowered variable name, parser) for each environment backed field
+_FIELD_SPECS: tuple[tuple[str, str, Callable[[str], Any]], ...] = tuple(
+    (attr.name, attr.metadata["var"].lower(), _PARSERS[attr.type])
+    for attr in fields(RadarrEnvironment)
+    if attr.metadata.get("var")
+)
+_EVENT_TYPE_SPEC = next(spec for spec in _FIELD_SPECS if spec[0] == "event_type")
+
+# Fields populated by Radarr for each event. Unlisted events parse every field.
+_MOVIE_FIELDS = ("movie_title", "movie_year")
+_EVENT_FIELDS: dict[Events, tuple[str, ...]] = {
+    Events.ON_GRAB: _MOVIE_FIELDS,
+    Events.ON_DOWNLOAD: _MOVIE_FIELDS + ("is_upgrade", "movie_file_dir", "movie_file_path", "movie_file_deleted_paths"),
+    Events.ON_RENAME: _MOVIE_FIELDS + ("movie_file_dir", "movie_file_paths", "movie_file_prev_paths"),
+    Events.ON_MOVIE_ADD: _MOVIE_FIELDS + ("movie_file_dir",),
+    Events.ON_MOVIE_DELETE: _MOVIE_FIELDS + ("movie_file_dir", "movie_folder_size", "movie_deleted_files"),
+    Events.ON_MOVIE_FILE_DELETE: _MOVIE_FIELDS + ("movie_file_dir", "movie_file_path", "movie_file_delete_reason"),
+    Events.ON_HEALTH_ISSUE: ("health_issue_msg",),
+    Events.ON_HEALTH_RESTORED: ("health_restored_msg",),
+    Events.ON_APPLICATION_UPDATE: ("update_message",),
+    Events.ON_MANUAL_INTERACTION_REQUIRED: _MOVIE_FIELDS,
+    Events.ON_TEST: (),
+}
+_EVENT_SPECS: dict[Events, tuple[tuple[str, str, Callable[[str], Any]], ...]] = {
+    event: tuple(spec for spec in _FIELD_SPECS if spec[0] in names) for event, names in _EVENT_FIELDS.items()
+}
@@ -1,11 +1,14 @@
 """Radarr_Kodi Event handler"""
 
+import time
 import logging
-from datetime import datetime
+from collections import defaultdict
+from datetime import timedelta
 from pathlib import Path
 from src.environment import RadarrEnvironment
 from src.config import Config
 from src.kodi import LibraryManager
+from src.kodi.models import MovieDetails
 from .exceptions import NFOTimeout
 
 
@@ -19,33 +22,59 @@ class EventHandler:
         self.log = logging.getLogger("EventHandler")
 
     # ------------- Helpers --------------------
-    def _wait_for_nfo(self, nfo: Path, timeout_min: int) -> None:
-        """Wait for file provided to be present in the file system.
+    def _wait_for_nfo(self, nfos: list[Path], timeout_min: int) -> None:
+        """Wait for all files provided to be present in the file system.
 
         Args:
-            nfos (Path): Path objects to check
-            timeout_min (int): Number of minuets to wait
+            nfos (list[Path]): Path objects to check
+            timeout_min (int): Number of minuets to wait for all files
 
         Raises:
-            NFOTimeout: Contains the elapsed time and missing filenames if timeout_min * len(nfos) exceeded
+            NFOTimeout: Contains the elapsed time and first missing filename if timeout_min exceeded
         """
         max_sec = timeout_min * 60
-        self.log.info("Waiting up to %s minuets for NFO File.", timeout_min)
+        self.log.info("Waiting up to %s minuets for %s NFO File[s].", timeout_min, len(nfos))
 
-        start = datetime.now()
+        start = time.monotonic()
+        deadline = start + max_sec
+        delay = 0.1
+        pending = list(nfos)
         while True:
-            elapsed = datetime.now() - start
-
-            # Check if NFO exists
-            if nfo.exists():
+            # Drop NFOs that exist
+            for nfo in [x for x in pending if x.exists()]:
                 self.log.debug("Found %s", nfo.name)
+                pending.remove(nfo)
+
+            if not pending:
                 break
 
             # Raise timeout if wait exceeds max_sec
-            if elapsed.total_seconds() >= max_sec:
-                raise NFOTimeout(elapsed_time=elapsed, missing_nfo=nfo)
+            if time.monotonic() >= deadline:
+                elapsed = timedelta(seconds=time.monotonic() - start)
+                raise NFOTimeout(elapsed_time=elapsed, missing_nfo=pending[0])
+
+            # Back off between checks, up to 2 seconds
+            time.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
 
-        self.log.info("All required NFO files were found after %s.", elapsed)
+        self.log.info("All required NFO files were found after %s.", timedelta(seconds=time.monotonic() - start))
+
+    def _reapply_metadata(self, removed_movies: list[MovieDetails], new_movies: list[MovieDetails]) -> None:
+        """Copy metadata from removed library entries to the new entries of the same movie.
+
+        Args:
+            removed_movies (list[MovieDetails]): Entries removed from the library
+            new_movies (list[MovieDetails]): Entries scanned into the library
+        """
+        # MovieDetails compare by tmdb id, index new movies on it once
+        new_by_tmdb: dict[str, list[MovieDetails]] = defaultdict(list)
+        for new_movie in new_movies:
+            new_by_tmdb[new_movie.tmdb].append(new_movie)
+
+        copy_metadata = self.kodi.copy_metadata
+        for removed_movie in removed_movies:
+            for new_movie in new_by_tmdb.get(removed_movie.tmdb, ()):
+                copy_metadata(removed_movie, new_movie)
 
     # ------------- Events -------------------------
     def grab(self) -> None:
@@ -59,7 +88,7 @@ class EventHandler:
 
         # Send notification for each attempted download
         title = "Radarr - Attempting Download"
-        self.kodi.notify(title=title, msg=f"{self.env.movie_title} ({self.env.movie_year})")
+        self.kodi.notify(title=title, msg=self.env.title_year)
 
     def download_new(self) -> None:
         """Downloaded a new Movie"""
@@ -67,9 +96,8 @@ class EventHandler:
 
         # Optionally, wait for NFO files to generate
         if self.cfg.library.wait_for_nfo:
-            movie_nfo = Path(self.env.movie_file_path).with_suffix(".nfo")
             try:
-                self._wait_for_nfo(movie_nfo, self.cfg.library.nfo_timeout_minuets)
+                self._wait_for_nfo([self.env.movie_nfo], self.cfg.library.nfo_timeout_minuets)
             except NFOTimeout as e:
                 self.log.critical(e)
                 return
@@ -100,8 +128,9 @@ class EventHandler:
 
         # Notify clients
         title = "Radarr - Downloaded New Movie"
+        notify = self.kodi.notify
         for movie in new_movies:
-            self.kodi.notify(title=title, msg=movie)
+            notify(title=title, msg=movie)
 
     def download_upgrade(self) -> None:
         """Downloaded an upgraded movie file"""
@@ -109,17 +138,18 @@ class EventHandler:
 
         # Store library data for replaced movies and remove those entries
         removed_movies = []
+        get_movies_by_file = self.kodi.get_movies_by_file
+        remove_movie = self.kodi.remove_movie
         for path in self.env.movie_file_deleted_paths:
-            old_movies = self.kodi.get_movies_by_file(path)
+            old_movies = get_movies_by_file(path)
             for mov in old_movies:
-                if self.kodi.remove_movie(mov):
+                if remove_movie(mov):
                     removed_movies.append(mov)
 
         # optionally, wait for NFO files to generate
         if self.cfg.library.wait_for_nfo:
-            movie_nfo = Path(self.env.movie_file_path).with_suffix(".nfo")
             try:
-                self._wait_for_nfo(movie_nfo, self.cfg.library.nfo_timeout_minuets)
+                self._wait_for_nfo([self.env.movie_nfo], self.cfg.library.nfo_timeout_minuets)
             except NFOTimeout as e:
                 self.log.critical(e)
                 return
@@ -140,17 +170,15 @@ class EventHandler:
             self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
 
         # reapply metadata from old library entries
-        for removed_movie in removed_movies:
-            for new_movie in new_movies:
-                if removed_movie == new_movie:
-                    self.kodi.copy_metadata(removed_movie, new_movie)
+        self._reapply_metadata(removed_movies, new_movies)
 
         # update remaining guis
         self.kodi.update_guis()
 
         # Restart playback of previously stopped movies
+        start_playback = self.kodi.start_playback
         for movie in new_movies:
-            self.kodi.start_playback(movie)
+            start_playback(movie)
 
         # Skip notifications if disabled
         if not self.cfg.notifications.on_download_upgrade:
@@ -159,8 +187,9 @@ class EventHandler:
 
         # notify clients
         title = "Radarr - Upgraded Movie"
+        notify = self.kodi.notify
         for new_movie in new_movies:
-            self.kodi.notify(title=title, msg=new_movie)
+            notify(title=title, msg=new_movie)
 
     def rename(self) -> None:
         """Renamed a Movie file"""
@@ -168,23 +197,26 @@ class EventHandler:
 
         # Store library data for replaced movies and remove those entries
         removed_movies = []
+        get_movies_by_file = self.kodi.get_movies_by_file
+        stop_playback = self.kodi.stop_playback
+        remove_movie = self.kodi.remove_movie
         for path in self.env.movie_file_prev_paths:
-            old_movies = self.kodi.get_movies_by_file(path)
+            old_movies = get_movies_by_file(path)
 
             # Stop playback and remove movies
             for old_movie in old_movies:
-                self.kodi.stop_playback(old_movie, reason="Rename in progress. Please wait...")
-                if self.kodi.remove_movie(old_movie):
+                stop_playback(old_movie, reason="Rename in progress. Please wait...")
+                if remove_movie(old_movie):
                     removed_movies.append(old_movie)
 
         # Optionally, wait for nfo files to be created
         if self.cfg.library.wait_for_nfo:
-            for nfo in [Path(x).with_suffix(".nfo") for x in self.env.movie_file_paths]:
-                try:
-                    self._wait_for_nfo(nfo, self.cfg.library.nfo_timeout_minuets)
-                except NFOTimeout as e:
-                    self.log.critical(e)
-                    return
+            nfos = [Path(x).with_suffix(".nfo") for x in self.env.movie_file_paths]
+            try:
+                self._wait_for_nfo(nfos, self.cfg.library.nfo_timeout_minuets)
+            except NFOTimeout as e:
+                self.log.critical(e)
+                return
 
         # Force library clean if manual removal failed
         if not removed_movies:
@@ -204,17 +236,15 @@ class EventHandler:
             self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
 
         # Reapply metadata
-        for removed_movie in removed_movies:
-            for new_movie in new_movies:
-                if removed_movie == new_movie:
-                    self.kodi.copy_metadata(removed_movie, new_movie)
+        self._reapply_metadata(removed_movies, new_movies)
 
         # Update GUIs
         self.kodi.update_guis()
 
         # Restart playback of previously stopped movie
+        start_playback = self.kodi.start_playback
         for new_movie in new_movies:
-            self.kodi.start_playback(new_movie)
+            start_playback(new_movie)
 
         # Skip notifications if disabled
         if not self.cfg.notifications.on_rename:
@@ -223,34 +253,37 @@ class EventHandler:
 
         # Notify clients
         title = "Radarr - Renamed Movie"
+        notify = self.kodi.notify
         for movie in new_movies:
-            self.kodi.notify(title=title, msg=movie)
+            notify(title=title, msg=movie)
 
     def delete_movie_file(self) -> None:
         """Remove a Movie"""
         self.log.info("Delete Movie File Event Detected")
 
+        old_movies = self.kodi.get_movies_by_file(self.env.movie_file_path)
+        stop_playback = self.kodi.stop_playback
+
         # Upgrades only. Stop playback and store data for restart after radarr replaces file
         if self.env.movie_file_delete_reason.lower() == "upgrade":
             # Stop movies that are currently playing
-            for old_movie in self.kodi.get_movies_by_file(self.env.movie_file_path):
-                self.kodi.stop_playback(old_movie, reason="Processing Upgrade. Please Wait...")
+            for old_movie in old_movies:
+                stop_playback(old_movie, reason="Processing Upgrade. Please Wait...")
             return
 
         # Store library data for removed movies and remove those entries
         removed_movies = []
-        for old_movie in self.kodi.get_movies_by_file(self.env.movie_file_path):
-            self.kodi.stop_playback(old_movie, reason="Deleted Movie")
-            if self.kodi.remove_movie(old_movie):
+        remove_movie = self.kodi.remove_movie
+        for old_movie in old_movies:
+            stop_playback(old_movie, reason="Deleted Movie")
+            if remove_movie(old_movie):
                 removed_movies.append(old_movie)
 
         if not removed_movies:
             self.log.warning("Failed to remove any old movies. Cleaning Required.")
-            if not self.cfg.library.clean_after_update:
-                self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
 
-        # Optionally, Clean Library
-        if self.cfg.library.clean_after_update:
+        # Clean Library if configured or required by a failed removal
+        if self.cfg.library.clean_after_update or not removed_movies:
             self.kodi.clean_library(skip_active=self.cfg.library.skip_active)
 
         # Update remaining guis
@@ -263,8 +296,9 @@ class EventHandler:
 
         # Notify clients
         title = "Radarr - Deleted Movie"
+        notify = self.kodi.notify
         for movie in removed_movies:
-            self.kodi.notify(title=title, msg=movie)
+            notify(title=title, msg=movie)
 
     def add_movie(self) -> None:
         """Adding a Movie"""
@@ -277,7 +311,7 @@ class EventHandler:
 
         # Notify clients
         title = "Radarr - Movie Added"
-        self.kodi.notify(title=title, msg=f"{self.env.movie_title} ({self.env.movie_year})")
+        self.kodi.notify(title=title, msg=self.env.title_year)
 
     def delete_movie(self) -> None:
         """Deleting a Movie"""
@@ -287,9 +321,11 @@ class EventHandler:
         if self.env.movie_deleted_files and self.env.movie_folder_size is not None:
             # Stop playback and remove movies
             movies = self.kodi.get_movies_by_dir(self.env.movie_file_dir)
+            stop_playback = self.kodi.stop_playback
+            remove_movie = self.kodi.remove_movie
             for movie in movies:
-                self.kodi.stop_playback(movie, "Movie deleted", False)
-                self.kodi.remove_movie(movie)
+                stop_playback(movie, "Movie deleted", False)
+                remove_movie(movie)
 
             # Optionally, Clean Library
             if self.cfg.library.clean_after_update:
@@ -308,7 +344,7 @@ class EventHandler:
 
         # Notify Clients
         title = "Radarr - Movie Deleted"
-        self.kodi.notify(title=title, msg=f"{self.env.movie_title} ({self.env.movie_year})")
+        self.kodi.notify(title=title, msg=self.env.title_year)
 
     def health_issue(self) -> None:
         """Experienced a Health Issue"""
@@ -363,7 +399,7 @@ class EventHandler:
 
         # Notify Clients
         title = "Radarr - Manual Interaction Required"
-        msg = f"Radarr needs help with {self.env.movie_title} ({self.env.movie_year})"
+        msg = f"Radarr needs help with {self.env.title_year}"
         self.kodi.notify(title=title, msg=msg)
 
     def test(self) -> None:
@@ -1,13 +1,24 @@
 """Kodi Host wrapper to manipulate many hosts"""
 
 import logging
-import pickle
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from time import sleep
+from time import sleep, monotonic, time
+from typing import Callable, Iterable, Iterator, TypeVar, Self
+import requests
+from requests.adapters import HTTPAdapter
 from src.config.models import HostConfig, PathMapping
 from .rpc_client import KodiRPC
 from .models import MovieDetails, StoppedMovie
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 class LibraryManager:
     """A Wrapper that exposes methods of the JSON-RPC API.
@@ -15,19 +26,85 @@ class LibraryManager:
     instances of kodi.
     """
 
-    PICKLE_PATH = Path(__file__).with_name("stopped_movies.pk1")
+    STORE_PATH = Path(__file__).with_name("stopped_movies.db")
+    STORE_MAX_AGE = 86_400
+    RETRY_MIN_DELAY = 0.5
+    RETRY_MAX_DELAY = 5
+    RETRY_LOG_INTERVAL = 30
 
     def __init__(self, host_configs: list[HostConfig], path_maps: list[PathMapping]) -> None:
         self.log = logging.getLogger("Library-Manager")
         self.log.debug("Building list of Kodi Hosts")
         self.hosts: list[KodiRPC] = []
+        # Shared by all hosts. Longest radarr paths first so the most specific mapping is the first match
+        self._path_maps = [
+            {"radarr": x.radarr, "kodi": x.kodi} for x in sorted(path_maps, key=lambda x: len(x.radarr), reverse=True)
+        ]
+
+        # One connection pool shared by all hosts, keeps connections alive between requests
+        pool_size = max(10, len(host_configs))
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+
+        enabled_configs: list[HostConfig] = []
         for cfg in host_configs:
-            if host := self._create_host(cfg, path_maps):
+            if cfg.enabled:
+                enabled_configs.append(cfg)
+            else:
+                self.log.debug("Skipping disabled host %s", cfg.name)
+
+        # Test connections concurrently, each probe is blocked on network I/O
+        results = self._run_concurrently(self._create_host, enabled_configs)
+
+        for cfg, host in zip(enabled_configs, results):
+            if host:
                 self.hosts.append(host)
             else:
                 self.log.info("Failed to connect to %s", cfg.name)
 
-    def _create_host(self, cfg: HostConfig, path_maps: list[PathMapping]) -> KodiRPC:
+        # Lower numbers = higher priority
+        self.hosts.sort(key=lambda x: x.priority)
+
+    def _ordered_hosts(self) -> list[KodiRPC]:
+        """Hosts ordered by priority then average response time, the order to try 'first available' calls"""
+        return sorted(self.hosts, key=lambda x: (x.priority, x.avg_latency or 0.0))
+
+    def _first_ok(self, method: str, *args, default: R) -> R:
+        """Call a KodiRPC method on each host in order and return the first truthy result.
+
+        Args:
+            method (str): Name of the KodiRPC method to call
+            *args: Arguments passed to the method
+            default (R): Returned when no host gives a truthy result
+
+        Returns:
+            R: Result of the first host that succeeded or default
+        """
+        for host in self._ordered_hosts():
+            if result := getattr(host, method)(*args):
+                return result
+
+        return default
+
+    @staticmethod
+    def _run_concurrently(func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """Call func on each item in a thread pool. Results are returned in the order of items.
+
+        Args:
+            func (Callable[[T], R]): Blocking callable, generally a JSON-RPC call
+            items (Iterable[T]): Items to pass to func
+
+        Returns:
+            list[R]: Results of each call
+        """
+        items = list(items)
+        if len(items) < 2:
+            return [func(x) for x in items]
+
+        with ThreadPoolExecutor(max_workers=len(items)) as executor:
+            return list(executor.map(func, items))
+
+    def _create_host(self, cfg: HostConfig) -> KodiRPC:
         """Create a new KodiRPC instance and return it if connection is successful"""
         host = KodiRPC(
             name=cfg.name,
@@ -35,7 +112,10 @@ class LibraryManager:
             port=cfg.port,
             user=cfg.user,
             password=cfg.password,
-            path_maps=[{"radarr": x.radarr, "kodi": x.kodi} for x in path_maps],
+            disable_notifications=cfg.disable_notifications,
+            priority=cfg.priority,
+            path_maps=self._path_maps,
+            session=self.session,
         )
         self.log.debug("Testing connection with %s", cfg.name)
         if host.is_alive:
@@ -43,65 +123,188 @@ class LibraryManager:
             return host
         return None
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.dispose_hosts()
+
     def dispose_hosts(self) -> None:
         """Close all sessions in all hosts"""
         for host in self.hosts:
             host.close_session()
+        self.session.close()
 
     @property
-    def hosts_not_scanned(self) -> list[KodiRPC]:
+    def hosts_not_scanned(self) -> Iterator[KodiRPC]:
         """All Kodi Hosts that were not scanned"""
-        return [x for x in self.hosts if not x.library_scanned]
+        return (x for x in self.hosts if not x.library_scanned)
 
     @property
-    def hosts_not_playing(self) -> list[KodiRPC]:
-        """list of hosts not currently playing"""
-        return [x for x in self.hosts if not x.is_playing]
+    def hosts_not_playing(self) -> Iterator[KodiRPC]:
+        """Hosts not currently playing. Each host is queried as the iterator is consumed"""
+        return (x for x in self.hosts if not x.is_playing)
 
     # -------------- Helpers -----------------------
+    def _connect_store(self, create: bool = True) -> sqlite3.Connection:
+        """Open the stopped movie store, creating its table if needed
+
+        Args:
+            create (bool, optional): Create the store if it does not exist. Defaults to True.
+
+        Raises:
+            sqlite3.OperationalError: If create is False and the store does not exist
+        """
+        if create:
+            conn = sqlite3.connect(self.STORE_PATH, isolation_level=None)
+        else:
+            conn = sqlite3.connect(f"{self.STORE_PATH.resolve().as_uri()}?mode=rw", uri=True, isolation_level=None)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stopped ("
+            "host TEXT, movie_id INTEGER, tmdb TEXT, position REAL, paused INTEGER, stopped_at REAL, data TEXT, "
+            "PRIMARY KEY (host, tmdb))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS stopped_tmdb ON stopped (tmdb)")
+        return conn
+
     def _serialize(self, stopped_movies: list[StoppedMovie]) -> None:
-        """Serialize and store list of stopped movies
+        """Serialize and store list of stopped movies. Replaces any entry for the same host and tmdb id.
 
         Args:
             stopped_movies (list[StoppedMovie]): Objects containing details of stopped library items
         """
-        self.log.debug("Storing stopped movies in %s. %s", self.PICKLE_PATH, stopped_movies)
+        self.log.debug("Storing stopped movies in %s. %s", self.STORE_PATH, stopped_movies)
+        rows = [
+            (x.host_name, x.movie.movie_id, x.movie.tmdb, x.position, x.paused, time(), json.dumps(x.to_dict()))
+            for x in stopped_movies
+        ]
         try:
-            with self.PICKLE_PATH.open(mode="wb") as file:
-                pickle.dump(stopped_movies, file)
-        except IOError as e:
+            with closing(self._connect_store()) as conn:
+                conn.executemany("INSERT OR REPLACE INTO stopped VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
             self.log.warning("Failed to store stopped movies. Error: %s", e)
 
-    def _deserialize(self) -> list[StoppedMovie]:
-        """Deserialize previously stored, stopped movies. Deletes persistent storage once complete.
+    def _deserialize(self, movie: MovieDetails) -> list[StoppedMovie]:
+        """Deserialize and remove previously stored, stopped entries of a movie. Expired entries are discarded.
+
+        Entries are removed as they are read so a failed restart is not retried by a later event at a stale position.
+
+        Args:
+            movie (MovieDetails): The movie to look up. Matched by tmdb id as the library entry may be new.
 
         Returns:
             list[StoppedMovies]: Objects containing details of stopped library items
         """
-        self.log.debug("Reading stopped movies file. %s", self.PICKLE_PATH)
+        self.log.debug("Reading stopped movies from %s", self.STORE_PATH)
+        try:
+            conn = self._connect_store(create=False)
+        except sqlite3.OperationalError:
+            # Nothing was ever stored
+            return []
+
         try:
-            with self.PICKLE_PATH.open(mode="rb") as file:
-                data = pickle.load(file)
-            self.PICKLE_PATH.unlink()
-        except IOError as e:
+            with closing(conn):
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM stopped WHERE stopped_at < ?", (time() - self.STORE_MAX_AGE,))
+                rows = conn.execute("SELECT data FROM stopped WHERE tmdb IS ?", (movie.tmdb,)).fetchall()
+                conn.execute("DELETE FROM stopped WHERE tmdb IS ?", (movie.tmdb,))
+                conn.execute("COMMIT")
+        except sqlite3.Error as e:
             self.log.warning("Failed to load previously stored movie data. ERROR: %s", e)
             return []
 
-        return data
+        try:
+            return [StoppedMovie.from_dict(json.loads(x[0])) for x in rows]
+        except (ValueError, KeyError, TypeError) as e:
+            self.log.warning("Failed to parse previously stored movie data. ERROR: %s", e)
+            return []
+
+    def _retry_on_hosts(self, operation: Callable[[KodiRPC], bool], skip_active: bool = False) -> None:
+        """Run an operation on the first host that succeeds. Blocks, backing off between rounds, until one does.
+
+        Args:
+            operation (Callable[[KodiRPC], bool]): Called with each host, returns True on success
+            skip_active (bool, optional): True if active hosts should be skipped. Defaults to False.
+        """
+        delay = self.RETRY_MIN_DELAY
+        last_log: float | None = None
+        while True:
+            # Only log skipped hosts on the first round and once per RETRY_LOG_INTERVAL after
+            now = monotonic()
+            verbose = last_log is None or now - last_log >= self.RETRY_LOG_INTERVAL
+            if verbose:
+                last_log = now
+
+            for host in self._ordered_hosts():
+                # Optionally, Skip active hosts
+                if skip_active and host.is_playing:
+                    if verbose:
+                        self.log.info("Skipping active player %s", host.name)
+                    continue
+
+                if operation(host):
+                    return
+
+            # Wait before trying all hosts again
+            if verbose:
+                self.log.info("No hosts available. Retrying with up to %ss between attempts.", self.RETRY_MAX_DELAY)
+            sleep(delay)
+            delay = min(delay * 2, self.RETRY_MAX_DELAY)
+
+    @staticmethod
+    def _group_by_host(stopped_movies: list[StoppedMovie]) -> dict[str, list[StoppedMovie]]:
+        """Index stopped movies by the name of the host they were stopped on"""
+        by_host: dict[str, list[StoppedMovie]] = defaultdict(list)
+        for stopped_movie in stopped_movies:
+            by_host[stopped_movie.host_name].append(stopped_movie)
+        return by_host
 
     # -------------- GUI Methods -------------------
     def update_guis(self) -> None:
         """Update GUI for all hosts not scanned"""
-        for host in self.hosts_not_scanned:
-            host.update_gui()
+        self._run_concurrently(lambda host: host.update_gui(), self.hosts_not_scanned)
 
     def notify(self, title: str, msg: str) -> None:
         """Send notification to all enabled hosts"""
-
-        for host in self.hosts:
-            host.notify(title, msg)
+        self._run_concurrently(lambda host: host.notify(title, msg), self.hosts)
 
     # -------------- Player Methods ----------------
+    def _stop_on_host(self, host: KodiRPC, movie: MovieDetails) -> list[StoppedMovie]:
+        """Stop every player of a host that is playing a movie and return what was stopped"""
+        stopped_movies: list[StoppedMovie] = []
+        movie_id = movie.movie_id
+        host_name = host.name
+
+        # Loop through players, get movie_id and player_id
+        for player in host.active_players:
+            snapshot = host.get_player_snapshot(player.player_id)
+            item = snapshot.item if snapshot else None
+
+            # Skip if unknown, not the movie we are looking for or not a movie
+            if not item or item.item_id != movie_id or item.type.casefold() != "movie":
+                continue
+
+            # Stop the player and collect position, paused state
+            self.log.info("%s Stopping playback of %s", host_name, movie)
+            host.stop_player(player.player_id)
+            stopped_movies.append(
+                StoppedMovie(host_name=host_name, movie=movie, position=snapshot.percentage, paused=snapshot.paused)
+            )
+
+        return stopped_movies
+
+    def _restart_on_host(self, host: KodiRPC, movie: MovieDetails, stopped_movies: list[StoppedMovie]) -> None:
+        """Restart movies previously stopped on a host, restoring their paused state"""
+        for stopped_movie in stopped_movies:
+            # Start playback
+            player = host.start_movie(movie.movie_id, stopped_movie.position)
+            if not player:
+                continue
+
+            # Pause if movie was previously paused
+            if stopped_movie.paused:
+                host.pause_player(player.player_id)
+
     def stop_playback(self, movie: MovieDetails, reason: str, store_result: bool = True) -> None:
         """Stop playback of a given movie on any host
 
@@ -110,45 +313,31 @@ class LibraryManager:
             reason (str): Short description of why it was stopped. Used with notifications.
             store_result (bool, optional): True when the intent is to restart later. Defaults to True.
         """
-        stopped_movies: list[StoppedMovie] = []
-
-        # Loop through players, get movie_id and player_id
-        for host in self.hosts:
-            for player in host.active_players:
-                item = host.get_player_item(player.player_id)
-
-                # Skip if not a movie
-                if item and item.type.lower() != "movie":
-                    continue
-
-                # Skip if not the movie we are looking for
-                if item.item_id != movie.movie_id:
-                    continue
-
-                # Stop the player and collect position, paused state
-                self.log.info("%s Stopping playback of %s", host.name, movie)
-                paused = host.is_paused(player.player_id)
-                position = host.player_percent(player.player_id)
-                host.stop_player(player.player_id)
-                stopped_movies.append(StoppedMovie(host_name=host.name, movie=movie, position=position, paused=paused))
+        # Stop the movie on all hosts at once, each host is polled and stopped independently
+        per_host = self._run_concurrently(lambda host: self._stop_on_host(host, movie), self.hosts)
+        stopped_movies = [x for host_stopped in per_host for x in host_stopped]
 
         # Return early if nothing was stopped on any host
         if not stopped_movies:
             return
 
-        # Store results of stopped movies
+        # Store results of stopped movies in the background while the UI loads
+        writer = None
         if store_result:
-            self._serialize(stopped_movies)
+            writer = threading.Thread(target=self._serialize, args=(stopped_movies,), daemon=True)
+            writer.start()
 
         # Pause to allow UI to load before sending notifications
         sleep(2)
 
+        if writer:
+            writer.join()
+
         # Send notifications about the stopped movie to the GUI
         title = "Radarr - Stopped Playback"
+        by_host = self._group_by_host(stopped_movies)
         for host in self.hosts:
-            for stopped_movie in stopped_movies:
-                if host.name != stopped_movie.host_name:
-                    continue
+            for _ in by_host.get(host.name, ()):
                 host.notify(title, reason, force=True)
 
     def start_playback(self, movie: MovieDetails) -> None:
@@ -157,29 +346,15 @@ class LibraryManager:
         Args:
             movie (MovieDetails): The movie to start.
         """
-        # Do not attempt if nothing was previously stored
-        if not self.PICKLE_PATH.exists():
-            return
-
-        stopped_movies = self._deserialize()
-        if stopped_movies:
-            self.log.debug("Attempting to restart movies [%s]", ", ".join([str(x) for x in stopped_movies]))
-        for host in self.hosts:
-            for stopped_movie in stopped_movies:
-                # Skip wrong host
-                if stopped_movie.host_name != host.name:
-                    continue
-
-                # Skip wrong movie
-                if stopped_movie.movie != movie:
-                    continue
-
-                # Start playback
-                player = host.start_movie(movie.movie_id, stopped_movie.position)
-
-                # Pause if movie was previously paused
-                if stopped_movie.paused and player:
-                    host.pause_player(player.player_id)
+        stopped_movies = self._deserialize(movie)
+        if stopped_movies and self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("Attempting to restart movies [%s]", ", ".join(str(x) for x in stopped_movies))
+        # Restart on all hosts at once, start_movie may wait several seconds for each player
+        by_host = self._group_by_host(stopped_movies)
+        self._run_concurrently(
+            lambda host: self._restart_on_host(host, movie, by_host[host.name]),
+            [x for x in self.hosts if x.name in by_host],
+        )
 
     # -------------- Library Scanning --------------
     def scan_directory(self, directory: str, skip_active: bool = False) -> list[MovieDetails]:
@@ -197,27 +372,13 @@ class LibraryManager:
         movies_before_scan = self.get_movies_by_dir(directory)
 
         # Scanning
-        scanned = False
-        while not scanned:
-            for host in self.hosts:
-                # Optionally, Skip active hosts
-                if skip_active and host.is_playing:
-                    self.log.info("Skipping active player %s", host.name)
-                    continue
-
-                # Scan the directory
-                if host.scan_movie_dir(directory):
-                    scanned = True
-                    break
-
-            # Wait 5 seconds before trying all hosts again
-            if not scanned:
-                sleep(5)
+        self._retry_on_hosts(lambda host: host.scan_movie_dir(directory), skip_active)
 
         # Get current movies (after scan)
         movies_after_scan = self.get_movies_by_dir(directory)
 
-        return [x for x in movies_after_scan if x not in movies_before_scan]
+        before_ids = {x.movie_id for x in movies_before_scan}
+        return [x for x in movies_after_scan if x.movie_id not in before_ids]
 
     def full_scan(self, skip_active: bool = False) -> list[MovieDetails]:
         """Conduct a full library scan. This is SQL and Filesystem expensive.
@@ -232,28 +393,14 @@ class LibraryManager:
         movies_before_scan = self.get_all_movies()
 
         # Scan Video library
-        scanned = False
-        while not scanned:
-            for host in self.hosts:
-                # Optionally, Skip active hosts
-                if skip_active and host.is_playing:
-                    self.log.info("Skipping active player %s", host.name)
-                    continue
-
-                # Scan the library
-                if host.full_video_scan():
-                    scanned = True
-                    break
-
-            # Wait 5 seconds before trying all hosts again
-            if not scanned:
-                sleep(5)
+        self._retry_on_hosts(lambda host: host.full_video_scan(), skip_active)
 
         # Get movies after scan
         movies_after_scan = self.get_all_movies()
 
         # Calculate added movies after scan and return
-        return [x for x in movies_after_scan if x not in movies_before_scan]
+        before_ids = {x.movie_id for x in movies_before_scan}
+        return [x for x in movies_after_scan if x.movie_id not in before_ids]
 
     def clean_library(self, skip_active: bool = False) -> None:
         """Clean the video library. Potentially a blocking method if no hosts successfully ever clean.
@@ -261,32 +408,14 @@ class LibraryManager:
         Args:
             skip_active (bool, optional): True if active players should be skipped. Defaults to False.
         """
-
         # Clean library
-        while True:
-            for host in self.hosts:
-                # Optionally, skip active hosts
-                if skip_active and host.is_playing:
-                    self.log.info("Skipping active player %s", host.name)
-                    continue
-
-                # Clean video library
-                if host.clean_video_library():
-                    return
-
-            # Wait 5 seconds before trying all hosts again
-            sleep(5)
+        self._retry_on_hosts(lambda host: host.clean_video_library(), skip_active)
 
     # -------------- Movie Methods --------------
     def get_all_movies(self) -> list[MovieDetails]:
         """Get all movies from library. This is a SQL expensive operation"""
         self.log.info("Getting all movies. This may take a moment.")
-        for host in self.hosts:
-            movies = host.get_all_movies()
-            if movies:
-                return movies
-
-        return []
+        return self._first_ok("get_all_movies", default=[])
 
     def get_movies_by_dir(self, movie_dir: str) -> list[MovieDetails]:
         """Get all movies that reside in a specific directory
@@ -297,12 +426,7 @@ class LibraryManager:
         Returns:
             list[MovieDetails]: Movies gathered from the library.
         """
-        for host in self.hosts:
-            movies = host.get_movies_by_dir(movie_dir)
-            if movies:
-                return movies
-
-        return []
+        return self._first_ok("get_movies_by_dir", movie_dir, default=[])
 
     def get_movies_by_file(self, movie_path: str) -> list[MovieDetails]:
         """Get all movies associated with a specific path
@@ -313,14 +437,7 @@ class LibraryManager:
         Returns:
             list[MovieDetails]: Movies gathered from the library.
         """
-        for host in self.hosts:
-            movies = host.get_movies_by_file(movie_path)
-            if not movies:
-                continue
-
-            return movies
-
-        return []
+        return self._first_ok("get_movies_by_file", movie_path, default=[])
 
     def remove_movie(self, movie: MovieDetails) -> bool:
         """Remove a movie from the library
@@ -332,11 +449,7 @@ class LibraryManager:
             bool: True if the movie was removed
         """
         self.log.info("Removing movie %s", movie)
-        for host in self.hosts:
-            if host.remove_movie(movie.movie_id):
-                return True
-
-        return False
+        return self._first_ok("remove_movie", movie.movie_id, default=False)
 
     def copy_metadata(self, old_movie: MovieDetails, new_movie: MovieDetails) -> bool:
         """Copy metadata from old movie to new movie
@@ -348,9 +461,5 @@ class LibraryManager:
         Returns:
             bool: True if the metadata was copied
         """
-        for host in self.hosts:
-            self.log.info("Applying metadata to new movie : %s", new_movie)
-            if host.set_movie_watched_state(old_movie, new_movie.movie_id):
-                return True
-
-        return False
+        self.log.info("Applying metadata to new movie : %s", new_movie)
+        return self._first_ok("set_movie_watched_state", old_movie, new_movie.movie_id, default=False)
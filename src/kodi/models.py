@@ -1,12 +1,11 @@
 """Response Models for Kodi JSON-RPC"""
 
 from enum import Enum
-from typing import Optional
-from dataclasses import dataclass, field
+from typing import Optional, Type, Self
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
 
 
-DT_FORMAT = "%Y-%m-%d %H:%M:%S"
 MOVIE_PROPERTIES = [
     "lastplayed",
     "playcount",
@@ -19,6 +18,12 @@ MOVIE_PROPERTIES = [
 ]
 
 
+def _format_dt(dt: datetime) -> str:
+    """Format dt as Kodi expects dates, without the locale and format string handling of strftime"""
+    # Equivalent to dt.strftime("%Y-%m-%d %H:%M:%S")
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+
+
 class Platform(Enum):
     """Kodi Platform enumeration"""
 
@@ -45,7 +50,7 @@ class RPCVersion:
         return f"{self.major}.{self.minor}.{self.patch}"
 
 
-@dataclass
+@dataclass(slots=True)
 class KodiResponse:
     """Kodi JSON-RPC Response Model"""
 
@@ -54,7 +59,7 @@ class KodiResponse:
     result: Optional[dict] | None = field(default=None)
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     """A Content player"""
 
@@ -63,7 +68,7 @@ class Player:
     type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerItem:
     """What the player is playing"""
 
@@ -72,20 +77,31 @@ class PlayerItem:
     type: str
 
 
+@dataclass(slots=True)
+class PlayerSnapshot:
+    """Item and playback state of a player"""
+
+    item: PlayerItem
+    speed: int
+    percentage: float
+
+    @property
+    def paused(self) -> bool:
+        """If the player is paused"""
+        return self.speed == 0
+
+
 @dataclass(slots=True)
 class ResumeState:
     """Resume Point of a Media Item"""
 
     position: int = field(default=0)
     total: int = field(default=0)
+    percent: float = field(init=False, repr=False, compare=False)
 
-    @property
-    def percent(self) -> float:
-        """Percent complete"""
-        if self.total == 0 or self.position == 0:
-            return 0.0
-
-        return (self.position / self.total) * 100
+    def __post_init__(self) -> None:
+        # Percent complete, computed once as the resume point is not changed after parsing
+        self.percent = (self.position / self.total) * 100 if self.total else 0.0
 
     def __str__(self) -> str:
         return f"Resume {self.percent:.2f}% Complete."
@@ -105,24 +121,19 @@ class WatchedState:
         """Formatted Date Added DT"""
         if not self.date_added:
             return ""
-        return self.date_added.strftime(DT_FORMAT)
+        return _format_dt(self.date_added)
 
     @property
     def last_played_str(self) -> str:
         """Formatted Last Played DT"""
         if not self.last_played:
             return ""
-        return self.last_played.strftime(DT_FORMAT)
+        return _format_dt(self.last_played)
 
     @property
     def is_watched(self) -> bool:
         """If this state represents watched"""
-        if self.play_count is None:
-            return False
-        if not self.last_played:
-            return False
-
-        return bool(self.last_played) and self.play_count > 0
+        return self.play_count is not None and self.play_count > 0 and bool(self.last_played)
 
     def __str__(self) -> str:
         return f"Added={self.date_added} Plays={self.play_count} LastPlay={self.last_played} {self.resume}"
@@ -155,3 +166,38 @@ class StoppedMovie:
 
     def __str__(self) -> str:
         return f"{self.movie} on {self.host_name} stopped at {self.position:.2f}%"
+
+    def to_dict(self) -> dict:
+        """JSON serializable dict of this instance"""
+        data = asdict(self)
+        data["movie"]["watched_state"]["date_added"] = self.movie.watched_state.date_added_str
+        data["movie"]["watched_state"]["last_played"] = self.movie.watched_state.last_played_str
+        return data
+
+    @classmethod
+    def from_dict(cls: Type["StoppedMovie"], data: dict) -> Self:
+        """Get Instance from dict values"""
+        movie = data["movie"]
+        state = movie["watched_state"]
+        return cls(
+            movie=MovieDetails(
+                movie_id=movie["movie_id"],
+                file=movie["file"],
+                title=movie["title"],
+                year=movie["year"],
+                imdb=movie["imdb"],
+                tmdb=movie["tmdb"],
+                watched_state=WatchedState(
+                    play_count=state["play_count"],
+                    date_added=datetime.fromisoformat(state["date_added"]) if state["date_added"] else None,
+                    last_played=datetime.fromisoformat(state["last_played"]) if state["last_played"] else None,
+                    resume=ResumeState(
+                        position=state["resume"]["position"],
+                        total=state["resume"]["total"],
+                    ),
+                ),
+            ),
+            host_name=data["host_name"],
+            position=data["position"],
+            paused=data["paused"],
+        )
@@ -2,10 +2,15 @@
 
 import time
 import json
+import itertools
 import logging
+import sys
 from datetime import datetime, timedelta
-from pathlib import PurePosixPath, PureWindowsPath
+from functools import cached_property, lru_cache
+from pathlib import PurePath, PurePosixPath, PureWindowsPath
+from typing import Any, Callable, Iterable
 import requests
+import urllib3
 from .exceptions import APIError, ScanTimeout
 from .models import (
     RPCVersion,
@@ -16,15 +21,60 @@ from .models import (
     MovieDetails,
     Player,
     PlayerItem,
+    PlayerSnapshot,
     MOVIE_PROPERTIES,
 )
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from ciso8601 import parse_datetime as _parse_dt
+except ImportError:
+    _parse_dt = datetime.fromisoformat
+
+NON_POSIX_PLATFORMS = frozenset({Platform.WINDOWS, Platform.UNKNOWN})
+
+
+def _template(method: str, params: dict = None) -> bytes:
+    """Serialize a request with fixed method and params once, leaving %d in place of the request id"""
+    req_params = {"jsonrpc": "2.0", "method": method}
+    if params:
+        req_params["params"] = params
+    return b'{"id":%d,' + _dumps(req_params)[1:].replace(b"%", b"%%")
+
+
+# Requests sent repeatedly with the same method and params
+_PING = _template("JSONRPC.Ping")
+_GET_ACTIVE_PLAYERS = _template("Player.GetActivePlayers")
+_GET_PLATFORM = _template("XBMC.GetInfoBooleans", {"booleans": tuple(x.value for x in Platform)})
+_IS_SCANNING = _template("XBMC.GetInfoBooleans", {"booleans": ["Library.IsScanning"]})
+_UPDATE_GUI = _template("VideoLibrary.Scan", {"directory": "/does_not_exist/", "showdialogs": False})
+_FULL_SCAN = _template("VideoLibrary.Scan", {"showdialogs": False})
+_CLEAN_MOVIES = _template("VideoLibrary.Clean", {"showdialogs": False, "content": "movies"})
+
 
 class KodiRPC:
     """Kodi JSON-RPC Client"""
 
     RETRIES = 3
     TIMEOUT = 5
+    PLAYING_CACHE_SECS = 2
+    LATENCY_WEIGHT = 0.2
     HEADERS = {"Content-Type": "application/json", "Accept": "plain/text"}
 
     def __init__(
@@ -37,22 +87,29 @@ class KodiRPC:
         disable_notifications: bool = False,
         priority: int = 0,
         path_maps: list[dict] = None,
+        session: requests.Session = None,
     ) -> None:
         self.log = logging.getLogger(f"Kodi.{name}")
         self.base_url = f"http://{ip_addr}:{port}/jsonrpc"
         self.name = name
         self.disable_notifications = disable_notifications
         self.priority = priority
-        self.path_maps = path_maps
+        self.path_maps = path_maps or []
         self.library_scanned = False
         self._platform: Platform = None
-
-        # Establish session
-        self.session = requests.Session()
-        if user and password:
-            self.session.auth = (user, password)
-        self.session.headers.update(self.HEADERS)
-        self.req_id = 0
+        self._is_playing: tuple[float, bool] | None = None
+        self.avg_latency: float | None = None
+
+        # Establish session, a provided session may be shared and is closed by its owner
+        self.auth = (user, password) if user and password else None
+        self._owns_session = session is None
+        self.session = session or requests.Session()
+        self._next_id = itertools.count().__next__
+
+        # Headers, auth and url are identical for every request, prepare them once and only attach a body per request
+        self._request_template = self.session.prepare_request(
+            requests.Request("POST", self.base_url, headers=self.HEADERS, auth=self.auth)
+        )
 
     def __str__(self) -> str:
         return f"{self.name} JSON-RPC({self.rpc_version})"
@@ -63,21 +120,16 @@ class KodiRPC:
         if self._platform:
             return self._platform
 
-        params = {"booleans": [x.value for x in Platform]}
         try:
-            resp = self._req("XBMC.GetInfoBooleans", params=params)
+            resp = self._req_template(_GET_PLATFORM)
         except APIError as e:
             self.log.warning("Failed to get platform info. Error: %s", e)
             self._platform = Platform.UNKNOWN
             return self._platform
 
-        # Check all platform booleans and return the first one that is True
-        for k, v in resp.result.items():
-            if v:
-                return Platform(k)
-
-        # Return unknown if no platform booleans are True
-        self._platform = Platform.UNKNOWN
+        # First platform boolean that is True, unknown if none are
+        members = Platform._value2member_map_
+        self._platform = next((members[k] for k, v in resp.result.items() if v and k in members), Platform.UNKNOWN)
         return self._platform
 
     @property
@@ -99,7 +151,7 @@ class KodiRPC:
     def is_alive(self) -> bool:
         """Return True if Kodi Host is responsive"""
         try:
-            resp = self._req("JSONRPC.Ping")
+            resp = self._req_template(_PING)
         except APIError:
             return False
 
@@ -107,14 +159,20 @@ class KodiRPC:
 
     @property
     def is_playing(self) -> bool:
-        """Return True if Kodi Host is currently playing content"""
-        return bool(self.active_players)
+        """Return True if Kodi Host is currently playing content. Cached for PLAYING_CACHE_SECS"""
+        now = time.monotonic()
+        if self._is_playing is not None and now - self._is_playing[0] < self.PLAYING_CACHE_SECS:
+            return self._is_playing[1]
+
+        playing = bool(self.active_players)
+        self._is_playing = (now, playing)
+        return playing
 
     @property
     def active_players(self) -> list[Player]:
         """Get a list of active players"""
         try:
-            resp = self._req("Player.GetActivePlayers")
+            resp = self._req_template(_GET_ACTIVE_PLAYERS)
         except APIError as e:
             self.log.warning("Failed to get active players. Error: %s", e)
             return []
@@ -134,50 +192,79 @@ class KodiRPC:
     @property
     def is_scanning(self) -> bool:
         """True if a library scan is in progress"""
-        params = {"booleans": ["Library.IsScanning"]}
         try:
-            resp = self._req("XBMC.GetInfoBooleans", params=params)
+            resp = self._req_template(_IS_SCANNING)
         except APIError as e:
             self.log.warning("Failed to determine scanning state. Error: %s", e)
             return False
 
         return resp.result["Library.IsScanning"]
 
-    @property
+    @cached_property
     def is_posix(self) -> bool:
         """If this host uses posix file naming conventions"""
-        return self.platform not in [Platform.WINDOWS, Platform.UNKNOWN]
+        return self.platform not in NON_POSIX_PLATFORMS
+
+    @cached_property
+    def _path_cls(self) -> type[PurePath]:
+        """Path flavour matching this host's file naming conventions"""
+        return PurePosixPath if self.is_posix else PureWindowsPath
 
     @staticmethod
     def _to_dt(dt_str: str) -> datetime | None:
         try:
-            return datetime.fromisoformat(dt_str)
+            return _parse_dt(dt_str)
         except ValueError:
             return None
 
     @staticmethod
     def _parse_movie_details(movie_data: dict) -> MovieDetails | None:
         try:
+            unique_id = movie_data["uniqueid"]
+            resume = movie_data["resume"]
+            date_added = movie_data["dateadded"]
+            last_played = movie_data["lastplayed"]
+            imdb = unique_id.get("imdb")
+            tmdb = unique_id.get("tmdb")
+
+            # Intern strings that are compared between library queries and stored movies
+            intern = sys.intern
             return MovieDetails(
                 movie_id=movie_data["movieid"],
-                file=movie_data["file"],
-                title=movie_data["title"],
+                file=intern(movie_data["file"]),
+                title=intern(movie_data["title"]),
                 year=movie_data["year"],
-                imdb=movie_data["uniqueid"].get("imdb"),
-                tmdb=movie_data["uniqueid"].get("tmdb"),
+                imdb=intern(imdb) if imdb else imdb,
+                tmdb=intern(tmdb) if tmdb else tmdb,
                 watched_state=WatchedState(
                     play_count=movie_data["playcount"],
-                    date_added=KodiRPC._to_dt(movie_data["dateadded"]),
-                    last_played=KodiRPC._to_dt(movie_data["lastplayed"]),
-                    resume=ResumeState(
-                        position=movie_data["resume"]["position"],
-                        total=movie_data["resume"]["total"],
-                    ),
+                    # Unset dates are empty strings, skip parsing them rather than raising and catching ValueError
+                    date_added=KodiRPC._to_dt(date_added) if date_added else None,
+                    last_played=KodiRPC._to_dt(last_played) if last_played else None,
+                    resume=ResumeState(position=resume["position"], total=resume["total"]),
                 ),
             )
         except KeyError:
             return None
 
+    @staticmethod
+    def _parse_movies(movies_data: Iterable[dict]) -> list[MovieDetails]:
+        """Parse a VideoLibrary.GetMovies result dropping any movie missing required fields"""
+        parse = KodiRPC._parse_movie_details
+        return [movie for movie in map(parse, movies_data) if movie is not None]
+
+    @staticmethod
+    def _parse_player_item(resp: KodiResponse | None) -> PlayerItem | None:
+        """Parse a Player.GetItem response, None if there is no response or it is missing required fields"""
+        if resp is None:
+            return None
+
+        try:
+            item = resp.result["item"]
+            return PlayerItem(item_id=item["id"], label=item["label"], type=item["type"])
+        except (KeyError, TypeError):
+            return None
+
     # --------------- Helper Methods -----------------
     def _map_path(self, path: str) -> str:
         """Map path from Radarr to Kodi path using path_maps"""
@@ -187,27 +274,27 @@ class KodiRPC:
                 out_str = path.replace(mapping["radarr"], mapping["kodi"])
                 break
 
-        if self.is_posix:
-            return str(PurePosixPath(out_str))
+        return self._normalize_path(out_str, self.is_posix)
 
-        return str(PureWindowsPath(out_str))
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _normalize_path(path: str, posix: bool) -> str:
+        """Normalize path for a posix or windows host. Cached as events re-map the same few paths"""
+        return str(PurePosixPath(path) if posix else PureWindowsPath(path))
 
     def _get_filename_from_path(self, path: str) -> str:
         """Extract filename from path based on os type"""
-        if self.is_posix:
-            return str(PurePosixPath(path).name)
-        return str(PureWindowsPath(path).name)
+        return self._path_cls(path).name
 
     def _get_dirname_from_path(self, path: str) -> str:
         """Extract dir name from path based on os type"""
-        if self.is_posix:
-            return str(PurePosixPath(path).parent)
-        return str(PureWindowsPath(path).parent)
+        return str(self._path_cls(path).parent)
 
     def _wait_for_video_scan(self, max_secs: int = 1800) -> timedelta:
         """Wait for video scan to complete"""
         # Default timeout = 30 Min
         start = datetime.now()
+        delay = 0.1
         self.log.debug("Waiting up to %s minuets for library scan to complete", max_secs / 60)
         while True:
             elapsed = datetime.now() - start
@@ -220,35 +307,66 @@ class KodiRPC:
             if elapsed.total_seconds() >= max_secs:
                 raise ScanTimeout(f"Waited for {elapsed}. Giving up.")
 
-            # Sleep for 100ms before checking again
-            time.sleep(0.1)
+            # Back off from 100ms up to 2s, short scans return quickly while long scans poll less often
+            time.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
 
-    def _req(self, method: str, params: dict = None, timeout: int = None) -> KodiResponse | None:
-        """Send request to this Kodi Host"""
-        req_params = {"jsonrpc": "2.0", "id": self.req_id, "method": method}
-        timeout = timeout or self.TIMEOUT
-        if params:
-            req_params["params"] = params
-        response = None
+    def _post(self, body: bytes, timeout: int, decode: Callable[[requests.Response], Any] = None) -> Any:
+        """Post a serialized JSON-RPC payload to this Kodi Host and return the decoded response.
+
+        Args:
+            body (bytes): Serialized JSON-RPC request or batch
+            timeout (int): Seconds to wait for the response
+            decode (Callable[[requests.Response], Any], optional): Reads a streamed response. Defaults to
+                loading the whole response as JSON.
+        """
+        start = time.monotonic()
         try:
-            resp = self.session.post(
-                url=self.base_url,
-                data=json.dumps(req_params).encode("utf-8"),
-                timeout=timeout or self.TIMEOUT,
-            )
-            resp.raise_for_status()
-            response = resp.json()
+            request = self._request_template.copy()
+            request.prepare_body(data=body, files=None)
+            with self.session.send(request, timeout=timeout, stream=decode is not None) as resp:
+                resp.raise_for_status()
+                response = decode(resp) if decode else _loads(resp.content)
         except requests.Timeout as e:
+            # Failures count as taking the full timeout so a failing host drops behind responsive ones
+            self._record_latency(timeout)
             raise APIError(f"Request timed out after {timeout}s") from e
         except requests.HTTPError as e:
+            self._record_latency(timeout)
             if resp.status_code == 401:
                 raise APIError("HTTP Error. Unauthorized. Check Credentials") from e
             raise APIError(f"HTTP Error. Error: {e}") from e
         except requests.ConnectionError as e:
+            self._record_latency(timeout)
             raise APIError(f"Connection Error. {e}") from e
-        finally:
-            self.req_id += 1
 
+        # Only quick requests reflect responsiveness, long queries and streamed parsing would skew host ordering
+        if decode is None and timeout <= self.TIMEOUT:
+            self._record_latency(time.monotonic() - start)
+        return response
+
+    def _record_latency(self, sample: float) -> None:
+        """Update the exponentially weighted average response time of this host"""
+        if self.avg_latency is None:
+            self.avg_latency = sample
+        else:
+            self.avg_latency = (1 - self.LATENCY_WEIGHT) * self.avg_latency + self.LATENCY_WEIGHT * sample
+
+    def _req(self, method: str, params: dict = None, timeout: int = None) -> KodiResponse | None:
+        """Send request to this Kodi Host"""
+        req_params = {"jsonrpc": "2.0", "id": self._next_id(), "method": method}
+        timeout = timeout or self.TIMEOUT
+        if params:
+            req_params["params"] = params
+        return self._parse_response(self._post(_dumps(req_params), timeout))
+
+    def _req_template(self, template: bytes, timeout: int = None) -> KodiResponse:
+        """Send a request pre-serialized by _template to this Kodi Host"""
+        return self._parse_response(self._post(template % self._next_id(), timeout or self.TIMEOUT))
+
+    @staticmethod
+    def _parse_response(response: dict) -> KodiResponse:
+        """Raise APIError if the response is an error, otherwise wrap it"""
         if "error" in response:
             raise APIError(response.get("error"))
 
@@ -258,18 +376,65 @@ class KodiRPC:
             result=response.get("result"),
         )
 
+    def _req_batch(
+        self, calls: list[tuple[str, dict | None]], timeout: int = None, raise_errors: bool = True
+    ) -> list[KodiResponse | None]:
+        """Send many requests to this Kodi Host in a single HTTP round trip.
+
+        Args:
+            calls (list[tuple[str, dict | None]]): Method and params of each request
+            timeout (int, optional): Seconds to wait for all responses. Defaults to TIMEOUT.
+            raise_errors (bool, optional): Raise if any request returned an error, otherwise return None in place of
+                its response. Defaults to True.
+
+        Raises:
+            APIError: If the batch failed or, when raise_errors is set, any request within it returned an error
+
+        Returns:
+            list[KodiResponse | None]: Responses in the same order as calls
+        """
+        timeout = timeout or self.TIMEOUT
+        next_id = self._next_id
+        batch = []
+        for method, params in calls:
+            req_params = {"jsonrpc": "2.0", "id": next_id(), "method": method}
+            if params:
+                req_params["params"] = params
+            batch.append(req_params)
+
+        response = self._post(_dumps(batch), timeout)
+        if not isinstance(response, list):
+            raise APIError(response.get("error") if isinstance(response, dict) else "Invalid batch response")
+
+        # Responses may arrive in any order, match them to requests by id
+        by_id = {x.get("id"): x for x in response}
+        responses: list[KodiResponse] = []
+        for req_params in batch:
+            resp = by_id.get(req_params["id"])
+            try:
+                if resp is None:
+                    raise APIError(f"No response to {req_params['method']}")
+                responses.append(self._parse_response(resp))
+            except APIError:
+                if raise_errors:
+                    raise
+                responses.append(None)
+
+        return responses
+
     def close_session(self) -> None:
-        """Close the session"""
+        """Close the session if owned by this client"""
+        if not self._owns_session:
+            return
         self.log.debug("Closing session")
         self.session.close()
 
     # --------------- UI Methods ---------------------
     def update_gui(self) -> None:
         """Update GUI|Widgets by scanning a non existent path"""
-        params = {"directory": "/does_not_exist/", "showdialogs": False}
         self.log.info("Updating GUI")
         try:
-            self._req("VideoLibrary.Scan", params=params)
+            self._req_template(_UPDATE_GUI)
         except APIError as e:
             self.log.warning("Failed to update GUI. Error: %s", e)
 
@@ -295,29 +460,14 @@ class KodiRPC:
     # --------------- Player Methods -----------------
     def is_paused(self, player_id: int) -> bool:
         """Return True if player is currently paused"""
-        # If player is stopped, speed is 0 (paused). Check for playing first.
-        if not self.is_playing:
-            return False
-
-        params = {"playerid": player_id, "properties": ["speed"]}
-        try:
-            resp = self._req("Player.GetProperties", params=params)
-        except APIError as e:
-            self.log.warning("Failed to determine paused state of player. Error: %s", e)
-            return False
-
-        return int(resp.result["speed"]) == 0
+        # A stopped player fails the snapshot rather than reporting speed 0 (paused)
+        snapshot = self.get_player_snapshot(player_id)
+        return snapshot.paused if snapshot else False
 
     def player_percent(self, player_id: int) -> float:
         """Return Position of player in percent complete"""
-        params = {"playerid": player_id, "properties": ["percentage"]}
-        try:
-            resp = self._req("Player.GetProperties", params=params)
-        except APIError as e:
-            self.log.warning("Failed to get player position. Error: %s", e)
-            return 0.0
-
-        return resp.result.get("percentage", 0.0)
+        snapshot = self.get_player_snapshot(player_id)
+        return snapshot.percentage if snapshot else 0.0
 
     def get_player_item(self, player_id: int) -> PlayerItem | None:
         """Get items a given player is playing"""
@@ -328,13 +478,46 @@ class KodiRPC:
             self.log.warning("Failed to get player item. Error: %s", e)
             return None
 
+        return self._parse_player_item(resp)
+
+    def _get_player_items(self, players: list[Player]) -> list[tuple[Player, PlayerItem | None]]:
+        """Get the item of each player in a single batched request"""
+        if not players:
+            return []
+
+        calls = [("Player.GetItem", {"playerid": x.player_id}) for x in players]
+        try:
+            # A player failing GetItem, such as an audio player, must not hide the items of the others
+            responses = self._req_batch(calls, raise_errors=False)
+        except APIError as e:
+            self.log.warning("Failed to get player items. Error: %s", e)
+            return []
+
+        return [(player, self._parse_player_item(resp)) for player, resp in zip(players, responses)]
+
+    def get_player_snapshot(self, player_id: int) -> PlayerSnapshot | None:
+        """Get the item, speed and position of a player in one request"""
+        calls = [
+            ("Player.GetItem", {"playerid": player_id}),
+            ("Player.GetProperties", {"playerid": player_id, "properties": ["speed", "percentage"]}),
+        ]
+        try:
+            item_resp, props_resp = self._req_batch(calls)
+        except APIError as e:
+            self.log.warning("Failed to get player state. Error: %s", e)
+            return None
+
+        item = self._parse_player_item(item_resp)
+        if item is None:
+            return None
+
         try:
-            return PlayerItem(
-                item_id=resp.result["item"]["id"],
-                label=resp.result["item"]["label"],
-                type=resp.result["item"]["type"],
+            return PlayerSnapshot(
+                item=item,
+                speed=int(props_resp.result["speed"]),
+                percentage=props_resp.result.get("percentage", 0.0),
             )
-        except KeyError:
+        except (KeyError, TypeError):
             return None
 
     def pause_player(self, player_id: int, max_retries: int = 3) -> None:
@@ -354,6 +537,7 @@ class KodiRPC:
     def stop_player(self, player_id: int) -> None:
         """Stops a player"""
         params = {"playerid": player_id}
+        self._is_playing = None
         try:
             self._req("Player.Stop", params=params)
         except APIError as e:
@@ -363,6 +547,7 @@ class KodiRPC:
         """Play a given movie and return the player object"""
         self.log.info("Restarting Movie %s", movie_id)
         params = {"item": {"movieid": movie_id}, "options": {"resume": position}}
+        self._is_playing = None
         try:
             self._req("Player.Open", params=params)
         except APIError as e:
@@ -370,18 +555,22 @@ class KodiRPC:
             return None
 
         # Wait for player to start
-        start = datetime.now()
+        deadline = time.monotonic() + 5
+        delay = 0.05
         while True:
-            for player in self.active_players:
-                item = self.get_player_item(player.player_id)
+            for player, item in self._get_player_items(self.active_players):
                 if item and item.type == "movie" and item.item_id == movie_id:
                     return player
 
             # Break out if time limit exceeded
-            if (datetime.now() - start).total_seconds() > 5:
+            if time.monotonic() >= deadline:
                 self.log.warning("Movie failed to start after 5 second. Giving up.")
                 return None
 
+            # Back off from 50ms up to 500ms rather than polling the host continuously
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
     # --------------- Library Methods ----------------
     def scan_movie_dir(self, directory: str) -> bool:
         """Scan a directory"""
@@ -411,10 +600,9 @@ class KodiRPC:
 
     def full_video_scan(self) -> bool:
         """Perform full video library scan"""
-        params = {"showdialogs": False}
         self.log.info("Performing full library scan")
         try:
-            self._req("VideoLibrary.Scan", params=params)
+            self._req_template(_FULL_SCAN)
         except APIError as e:
             self.log.warning("Failed to scan full library. Error: %s", e)
             return False
@@ -433,11 +621,9 @@ class KodiRPC:
         """Clean Video Library"""
         # Passing a movie_dir does not initiate clean. With or without trailing '/'
         # Preferably, should set {'directory': movie_dir} vice {'content': 'movies'}
-        params = {"showdialogs": False, "content": "movies"}
-
         self.log.info("Cleaning Movie library.")
         try:
-            self._req("VideoLibrary.Clean", params=params)
+            self._req_template(_CLEAN_MOVIES)
         except APIError as e:
             self.log.warning("Failed to clean library. Error: %s", e)
             return False
@@ -481,12 +667,47 @@ class KodiRPC:
         self.log.debug("Getting all movies")
         params = {"properties": MOVIE_PROPERTIES}
         try:
+            if ijson:
+                return self._stream_movies(params, timeout=60)
             resp = self._req("VideoLibrary.GetMovies", params=params, timeout=60)
         except APIError as e:
             self.log.warning("Failed to get all movies. Error: %s", e)
             return []
 
-        return [self._parse_movie_details(x) for x in resp.result["movies"]]
+        return self._parse_movies(resp.result.get("movies", []))
+
+    def _stream_movies(self, params: dict, timeout: int) -> list[MovieDetails]:
+        """Get movies parsing each one as it is received, the whole response is never held in memory. Requires ijson.
+
+        Raises:
+            APIError: If the request failed, returned an error or the response could not be read
+        """
+        req_params = {"jsonrpc": "2.0", "id": self._next_id(), "method": "VideoLibrary.GetMovies", "params": params}
+
+        def decode(resp: requests.Response) -> list[MovieDetails]:
+            resp.raw.decode_content = True
+            error = ijson.ObjectBuilder()
+            errored = False
+
+            def events():
+                # Collect a top level error member while passing every event on to the movie parser
+                nonlocal errored
+                for prefix, event, value in ijson.parse(resp.raw, use_float=True):
+                    if prefix == "error" or prefix.startswith("error."):
+                        errored = True
+                        error.event(event, value)
+                    yield prefix, event, value
+
+            try:
+                movies = self._parse_movies(ijson.items(events(), "result.movies.item"))
+            except (ijson.JSONError, urllib3.exceptions.HTTPError) as e:
+                raise APIError(f"Failed to read movies. {e}") from e
+
+            if errored:
+                raise APIError(error.value)
+            return movies
+
+        return self._post(_dumps(req_params), timeout, decode=decode)
 
     def get_movies_by_dir(self, directory: str) -> list[MovieDetails]:
         """Get all movies in a directory"""
@@ -503,7 +724,7 @@ class KodiRPC:
             self.log.warning("Failed to get movies from file '%s'. Error: %s", mapped_path, e)
             return []
 
-        return [self._parse_movie_details(x) for x in resp.result["movies"]]
+        return self._parse_movies(resp.result.get("movies", []))
 
     def get_movies_by_file(self, path: str) -> list[MovieDetails]:
         """Get all movies given a file path"""
@@ -527,7 +748,7 @@ class KodiRPC:
             self.log.warning("Failed to get movies from file '%s'. Error: %s", mapped_path, e)
             return []
 
-        return [self._parse_movie_details(x) for x in resp.result["movies"]]
+        return self._parse_movies(resp.result.get("movies", []))
 
     def remove_movie(self, movie_id: int) -> bool:
         """Remove a movie from library and return it's details"""